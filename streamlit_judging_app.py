@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+import sys
 import glob
 import sqlite3
 import threading
@@ -9,7 +10,11 @@ import time
 from datetime import datetime
 import requests
 import base64
-from typing import Dict, Any, Optional
+import gzip
+import hashlib
+import zlib
+from contextlib import closing
+from typing import Dict, Any, List, Optional, Tuple
 
 # Page configuration
 st.set_page_config(
@@ -19,15 +24,47 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def get_config(key: str, default: str = "") -> str:
+    """Read a setting from Streamlit secrets, falling back to the environment
+    
+    Hosts that only set environment variables (and the command line restore)
+    have no secrets.toml, where st.secrets raises instead of returning.
+    """
+    try:
+        return st.secrets.get(key, os.getenv(key, default))
+    except FileNotFoundError:
+        return os.getenv(key, default)
+
 # GitHub Configuration - Updated for your repository
-GITHUB_TOKEN = st.secrets.get("GITHUB_TOKEN", os.getenv("GITHUB_TOKEN", ""))
+GITHUB_TOKEN = get_config("GITHUB_TOKEN")
 GITHUB_REPO = "alinalhammadi/satellite-judging-system"
 BACKUP_FOLDER = "database_backups"
 
+# Local directory or HTTP backup store; used instead of GitHub when set
+BACKUP_STORE_DIR = get_config("BACKUP_STORE_DIR")
+BACKUP_STORE_URL = get_config("BACKUP_STORE_URL")
+WARM_START_TIMEOUT = 120  # seconds before a non-empty local database is used while the store is unreachable
+WARM_START_RETRY_DELAY = 5  # first retry delay when the store is unreachable, doubled per attempt
+WARM_START_MAX_RETRY_DELAY = 300
+BACKUP_MANIFEST_FILE = "backup_manifest.json"
+BACKUP_NAME_PREFIX = "database_backup_"
+BACKUP_PRUNE_BATCH = 20  # max snapshots deleted per backup run (each GitHub delete is a commit)
+
+# Backup retention tiers: (max age in seconds, minimum spacing in seconds)
+BACKUP_RETENTION = [
+    (3600, 30),       # every 30s for the last hour
+    (86400, 3600),    # hourly for the last day
+    (None, 86400),    # daily after that
+]
+
 # Database configuration
 DB_FILE = "judging_database.db"
 BACKUP_INTERVAL = 30  # seconds
 
+# Analytics snapshot configuration (admin exports/leaderboards read from here)
+ANALYTICS_SNAPSHOT_FILE = "judging_analytics_snapshot.db"
+ANALYTICS_REFRESH_INTERVAL = int(get_config("ANALYTICS_REFRESH_INTERVAL", "60"))  # seconds
+
 # Team data (final order and names)
 TEAMS = [
     {"id": 1, "name": "MOD", "project": "Coherent Change Detection (CCD) & Displacement of Ballistic Missile Vehicles", "domain": "Defense", "data": "SAR, EO", "members": "Mohamed Albreiki, Suood Almazrouei"},
@@ -101,74 +138,425 @@ SCORE_DESCRIPTIONS = {
     }
 }
 
+def migrate_v1_initial_schema(cursor: sqlite3.Cursor):
+    """Original layout: judge/team names and criterion keys stored as TEXT"""
+    # Judges table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS judges (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Evaluations table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS evaluations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            judge_name TEXT NOT NULL,
+            team_id INTEGER NOT NULL,
+            team_name TEXT NOT NULL,
+            criterion_id TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(judge_name, team_id, criterion_id)
+        )
+    ''')
+    
+    # Comments table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            judge_name TEXT NOT NULL,
+            team_id INTEGER NOT NULL,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(judge_name, team_id)
+        )
+    ''')
+    
+    # Activity log for debugging
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            judge_name TEXT,
+            action TEXT,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def migrate_v2_normalized_scores(cursor: sqlite3.Cursor):
+    """Replace text-keyed evaluations/comments with integer-keyed tables"""
+    # Lookup tables so score rows only carry small integers
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS criteria (
+            id INTEGER PRIMARY KEY,
+            key TEXT UNIQUE NOT NULL
+        )
+    ''')
+    
+    # One row per (judge, team, criterion); the primary key doubles as the
+    # covering index for per-judge progress and the export scan
+    cursor.execute('''
+        CREATE TABLE scores (
+            judge_id INTEGER NOT NULL REFERENCES judges(id),
+            team_id INTEGER NOT NULL REFERENCES teams(id),
+            criterion_id INTEGER NOT NULL REFERENCES criteria(id),
+            score INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (judge_id, team_id, criterion_id)
+        ) WITHOUT ROWID
+    ''')
+    # Covering index for per-team aggregation (averages, leaderboards)
+    cursor.execute('''
+        CREATE INDEX idx_scores_team ON scores (team_id, criterion_id, score)
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE team_comments (
+            judge_id INTEGER NOT NULL REFERENCES judges(id),
+            team_id INTEGER NOT NULL REFERENCES teams(id),
+            comment TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (judge_id, team_id)
+        )
+    ''')
+    
+    # Carry over existing data from the v1 tables
+    cursor.execute('''
+        INSERT OR IGNORE INTO judges (name)
+        SELECT DISTINCT judge_name FROM evaluations
+        UNION SELECT DISTINCT judge_name FROM comments
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO teams (id, name)
+        SELECT team_id, MAX(team_name) FROM evaluations GROUP BY team_id
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO criteria (key)
+        SELECT DISTINCT criterion_id FROM evaluations ORDER BY criterion_id
+    ''')
+    cursor.execute('''
+        INSERT INTO scores (judge_id, team_id, criterion_id, score, updated_at)
+        SELECT j.id, e.team_id, c.id, e.score, e.updated_at
+        FROM evaluations e
+        JOIN judges j ON j.name = e.judge_name
+        JOIN criteria c ON c.key = e.criterion_id
+    ''')
+    cursor.execute('''
+        INSERT INTO team_comments (judge_id, team_id, comment, updated_at)
+        SELECT j.id, c.team_id, c.comment, c.updated_at
+        FROM comments c
+        JOIN judges j ON j.name = c.judge_name
+    ''')
+    
+    cursor.execute("DROP TABLE evaluations")
+    cursor.execute("DROP TABLE comments")
+
+# Schema migrations, applied in order; PRAGMA user_version records how many ran
+MIGRATIONS = [
+    migrate_v1_initial_schema,
+    migrate_v2_normalized_scores,
+]
+
+def parse_backup_timestamp(name: str) -> Optional[datetime]:
+    """Extract the snapshot time from a 'database_backup_YYYYmmdd_HHMMSS[_mmm[_sha256]].db[.gz]' name"""
+    if not name.startswith(BACKUP_NAME_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(BACKUP_NAME_PREFIX):len(BACKUP_NAME_PREFIX) + 15], '%Y%m%d_%H%M%S')
+    except ValueError:
+        return None
+
+def parse_backup_digest(name: str) -> Optional[str]:
+    """Extract the sha256 from a 'database_backup_YYYYmmdd_HHMMSS_mmm_<sha256>.db.gz' name"""
+    parts = name[len(BACKUP_NAME_PREFIX):].split('.')[0].split('_')
+    if len(parts) == 4 and len(parts[3]) == 64:
+        return parts[3]
+    return None
+
+def select_backups_to_keep(entries: List[Dict[str, Any]], now: datetime) -> set:
+    """Apply BACKUP_RETENTION: keep the newest snapshot in each spacing bucket of its age tier"""
+    keep = set()
+    seen_buckets = set()
+    
+    for entry in sorted(entries, key=lambda e: e['created_at'], reverse=True):
+        created_at = datetime.fromisoformat(entry['created_at'])
+        age = (now - created_at).total_seconds()
+        
+        for max_age, spacing in BACKUP_RETENTION:
+            if max_age is None or age <= max_age:
+                break
+        
+        bucket = (spacing, int(created_at.timestamp() // spacing))
+        if bucket not in seen_buckets:
+            seen_buckets.add(bucket)
+            keep.add(entry['name'])
+    
+    return keep
+
+class LocalBackupStore:
+    """Backup store in a local directory (also a stand-in remote for testing)"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def describe(self) -> str:
+        return os.path.abspath(self.directory)
+    
+    def list_backups(self) -> List[Dict[str, Any]]:
+        return [
+            {'name': name, 'ref': None, 'size': os.path.getsize(os.path.join(self.directory, name))}
+            for name in sorted(os.listdir(self.directory))
+            if parse_backup_timestamp(name)
+        ]
+    
+    def upload(self, name: str, data: bytes) -> Optional[str]:
+        temp_path = os.path.join(self.directory, f".{name}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, os.path.join(self.directory, name))
+        return None
+    
+    def open_download(self, name: str):
+        return open(os.path.join(self.directory, name), 'rb')
+    
+    def delete(self, name: str, ref: Optional[str]):
+        os.remove(os.path.join(self.directory, name))
+
+class GitHubBackupStore:
+    """Backup store in a folder of a GitHub repository (contents API)"""
+    
+    def __init__(self, token: str, repo: str, folder: str):
+        self.repo = repo
+        self.folder = folder
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self.folder_url = f"https://api.github.com/repos/{repo}/contents/{folder}"
+        self.tree_url = f"https://api.github.com/repos/{repo}/git/trees/main"
+    
+    def describe(self) -> str:
+        return f"{self.repo}/{self.folder}"
+    
+    def list_backups(self) -> List[Dict[str, Any]]:
+        # The contents API stops at 1,000 entries per directory; the tree API does not
+        response = requests.get(self.tree_url, headers=self.headers, params={"recursive": "1"}, timeout=60)
+        if response.status_code == 404:
+            return []
+        if response.status_code != 200:
+            raise RuntimeError(f"GitHub list failed: {response.status_code} - {response.text}")
+        
+        tree = response.json()
+        if tree.get('truncated'):
+            print("GitHub tree listing truncated; some backups may be missing from the manifest")
+        
+        prefix = f"{self.folder}/"
+        backups = []
+        for item in tree.get('tree', []):
+            name = item['path'][len(prefix):]
+            if item['type'] == 'blob' and item['path'].startswith(prefix) and parse_backup_timestamp(name):
+                backups.append({'name': name, 'ref': item['sha'], 'size': item.get('size', 0)})
+        return backups
+    
+    def upload(self, name: str, data: bytes) -> Optional[str]:
+        data = {
+            "message": f"Auto-backup: {name}",
+            "content": base64.b64encode(data).decode(),
+            "branch": "main"
+        }
+        response = requests.put(f"{self.folder_url}/{name}", json=data, headers=self.headers)
+        if response.status_code != 201:
+            raise RuntimeError(f"GitHub backup failed: {response.status_code} - {response.text}")
+        return response.json()['content']['sha']
+    
+    def open_download(self, name: str):
+        headers = dict(self.headers, Accept="application/vnd.github.raw")
+        response = requests.get(f"{self.folder_url}/{name}", headers=headers, params={"ref": "main"}, stream=True)
+        if response.status_code != 200:
+            raise RuntimeError(f"GitHub download failed: {response.status_code} - {response.text}")
+        response.raw.decode_content = True
+        return response.raw
+    
+    def delete(self, name: str, ref: Optional[str]):
+        data = {
+            "message": f"Prune backup: {name}",
+            "sha": ref,
+            "branch": "main"
+        }
+        response = requests.delete(f"{self.folder_url}/{name}", json=data, headers=self.headers)
+        if response.status_code not in (200, 404):
+            raise RuntimeError(f"GitHub delete failed: {response.status_code} - {response.text}")
+
+class HttpBackupStore:
+    """Backup store on a plain HTTP object server (GET/PUT/DELETE per file)
+    
+    GET on the base URL must return a JSON list of {"name": ..., "size": ...}.
+    """
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+    
+    def describe(self) -> str:
+        return self.base_url
+    
+    def list_backups(self) -> List[Dict[str, Any]]:
+        response = requests.get(f"{self.base_url}/", timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP list failed: {response.status_code} - {response.text}")
+        
+        return [
+            {'name': item['name'], 'ref': None, 'size': item.get('size', 0)}
+            for item in response.json()
+            if parse_backup_timestamp(item['name'])
+        ]
+    
+    def upload(self, name: str, data: bytes) -> Optional[str]:
+        response = requests.put(f"{self.base_url}/{name}", data=data, timeout=60)
+        if response.status_code not in (200, 201, 204):
+            raise RuntimeError(f"HTTP backup failed: {response.status_code} - {response.text}")
+        return None
+    
+    def open_download(self, name: str):
+        response = requests.get(f"{self.base_url}/{name}", stream=True, timeout=60)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP download failed: {response.status_code} - {response.text}")
+        response.raw.decode_content = True
+        return response.raw
+    
+    def delete(self, name: str, ref: Optional[str]):
+        response = requests.delete(f"{self.base_url}/{name}", timeout=30)
+        if response.status_code not in (200, 204, 404):
+            raise RuntimeError(f"HTTP delete failed: {response.status_code} - {response.text}")
+
+def get_backup_store():
+    """Return the configured backup store, or None if backups are not configured"""
+    if BACKUP_STORE_DIR:
+        return LocalBackupStore(BACKUP_STORE_DIR)
+    if BACKUP_STORE_URL:
+        return HttpBackupStore(BACKUP_STORE_URL)
+    if GITHUB_TOKEN and GITHUB_REPO:
+        return GitHubBackupStore(GITHUB_TOKEN, GITHUB_REPO, BACKUP_FOLDER)
+    return None
+
 class DatabaseManager:
     """Handles all database operations with automatic backups"""
     
-    def __init__(self, db_file: str):
+    def __init__(self, db_file: str, start_background: bool = True):
+        """start_background=False skips the warm start and the backup/refresh threads (restore command)"""
         self.db_file = db_file
+        self.ready = threading.Event()
+        self.store_synced = threading.Event()  # warm start has reconciled with the store
+        self.backups_paused = False
+        self.warm_start_status = None
+        
+        db_was_missing = not os.path.exists(db_file)
         self.init_database()
-        self.start_backup_thread()
+        
+        # Ephemeral hosts lose the database on restart; pull it back from backup
+        if start_background and get_backup_store() is not None:
+            threading.Thread(target=self.warm_start, args=(db_was_missing,), name="warm-start", daemon=True).start()
+        else:
+            self.ready.set()
+            self.store_synced.set()
+        
+        if start_background:
+            self.start_backup_thread()
+            self.start_analytics_thread()
+    
+    def wait_until_ready(self) -> bool:
+        """Block until any startup restore has finished"""
+        return self.ready.wait(WARM_START_TIMEOUT)
     
     def init_database(self):
-        """Initialize the database with required tables"""
+        """Initialize the database and bring its schema up to date"""
         try:
             with sqlite3.connect(self.db_file) as conn:
-                cursor = conn.cursor()
-                
-                # Judges table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS judges (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Evaluations table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS evaluations (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        judge_name TEXT NOT NULL,
-                        team_id INTEGER NOT NULL,
-                        team_name TEXT NOT NULL,
-                        criterion_id TEXT NOT NULL,
-                        score INTEGER NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(judge_name, team_id, criterion_id)
-                    )
-                ''')
-                
-                # Comments table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS comments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        judge_name TEXT NOT NULL,
-                        team_id INTEGER NOT NULL,
-                        comment TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(judge_name, team_id)
-                    )
-                ''')
-                
-                # Activity log for debugging
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS activity_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        judge_name TEXT,
-                        action TEXT,
-                        details TEXT,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                conn.commit()
-                
+                # WAL lets the snapshot and backup copies (VACUUM INTO) read
+                # while judges commit; the rollback journal blocks writers meanwhile
+                conn.execute("PRAGMA journal_mode=WAL")
+                self.migrate_database(conn)
+                self.sync_reference_data(conn)
+                self.criterion_ids = self.load_criterion_ids(conn)
+        
         except Exception as e:
             st.error(f"Database initialization failed: {e}")
     
+    def migrate_database(self, conn: sqlite3.Connection):
+        """Apply pending schema migrations, one transaction per version.
+        
+        The schema version lives in PRAGMA user_version and is bumped in the
+        same transaction as the migration itself, so an interrupted migration
+        rolls back completely and is simply re-run on the next start.
+        """
+        cursor = conn.cursor()
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return
+        
+        existing_tables = None
+        for version, migration in enumerate(MIGRATIONS, start=1):
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read under the write lock: another process opening the same
+                # legacy file may have applied this version in the meantime
+                if cursor.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    cursor.execute("COMMIT")
+                    continue
+                if existing_tables is None:
+                    existing_tables = cursor.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+                
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                cursor.execute("COMMIT")
+            except Exception as e:
+                cursor.execute("ROLLBACK")
+                raise e
+        
+        # Reclaim the pages freed by dropped legacy tables
+        if existing_tables:
+            cursor.execute("VACUUM")
+    
+    def sync_reference_data(self, conn: sqlite3.Connection):
+        """Make sure every configured team and criterion has an integer id"""
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO teams (id, name) VALUES (?, ?)
+            ON CONFLICT(id) DO UPDATE SET name = excluded.name
+        ''', [(team['id'], team['name']) for team in TEAMS])
+        cursor.executemany(
+            "INSERT OR IGNORE INTO criteria (key) VALUES (?)",
+            [(criterion['id'],) for criterion in CRITERIA]
+        )
+        conn.commit()
+    
+    def load_criterion_ids(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Map criterion keys (e.g. 'problem_definition') to their integer ids"""
+        cursor = conn.cursor()
+        cursor.execute("SELECT key, id FROM criteria")
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    def get_judge_id(self, cursor: sqlite3.Cursor, judge_name: str) -> int:
+        """Register the judge if needed, mark them active and return their id"""
+        cursor.execute('''
+            INSERT INTO judges (name, last_active)
+            VALUES (?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET last_active = CURRENT_TIMESTAMP
+        ''', (judge_name,))
+        cursor.execute("SELECT id FROM judges WHERE name = ?", (judge_name,))
+        return cursor.fetchone()[0]
+    
     def log_activity(self, judge_name: str, action: str, details: str = ""):
         """Log activity for debugging and audit purposes"""
         try:
@@ -184,13 +572,15 @@ class DatabaseManager:
     
     def save_judge(self, judge_name: str) -> bool:
         """Save or update judge information"""
+        # Anything written during a startup restore would be replaced by the snapshot
+        if not self.ready.is_set():
+            return False
+        
         try:
             with sqlite3.connect(self.db_file) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO judges (name, last_active)
-                    VALUES (?, CURRENT_TIMESTAMP)
-                ''', (judge_name,))
+                # Upsert rather than REPLACE so the judge keeps their id
+                self.get_judge_id(cursor, judge_name)
                 conn.commit()
                 self.log_activity(judge_name, "judge_login", "Judge session started")
                 return True
@@ -200,6 +590,12 @@ class DatabaseManager:
     
     def save_evaluation(self, judge_name: str, team_id: int, team_name: str, scores: Dict[str, int], comment: str = "") -> bool:
         """Save evaluation scores and comments with atomic transaction"""
+        # Scores entered before the restore finished were based on the empty
+        # local database; writing them would overwrite the restored ones
+        if not self.ready.is_set():
+            st.error("Database is still being restored from backup - scores not saved, please reload")
+            return False
+        
         try:
             with sqlite3.connect(self.db_file) as conn:
                 cursor = conn.cursor()
@@ -208,26 +604,26 @@ class DatabaseManager:
                 cursor.execute("BEGIN TRANSACTION")
                 
                 try:
+                    # Resolve judge id and update judge activity
+                    judge_id = self.get_judge_id(cursor, judge_name)
+                    
                     # Save scores
-                    for criterion_id, score in scores.items():
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO evaluations 
-                            (judge_name, team_id, team_name, criterion_id, score, updated_at)
-                            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                        ''', (judge_name, team_id, team_name, criterion_id, score))
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO scores
+                        (judge_id, team_id, criterion_id, score, updated_at)
+                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ''', [
+                        (judge_id, team_id, self.criterion_ids[criterion_id], score)
+                        for criterion_id, score in scores.items()
+                    ])
                     
                     # Save comment
                     if comment.strip():
                         cursor.execute('''
-                            INSERT OR REPLACE INTO comments
-                            (judge_name, team_id, comment, updated_at)
+                            INSERT OR REPLACE INTO team_comments
+                            (judge_id, team_id, comment, updated_at)
                             VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                        ''', (judge_name, team_id, comment.strip()))
-                    
-                    # Update judge activity
-                    cursor.execute('''
-                        UPDATE judges SET last_active = CURRENT_TIMESTAMP WHERE name = ?
-                    ''', (judge_name,))
+                        ''', (judge_id, team_id, comment.strip()))
                     
                     cursor.execute("COMMIT")
                     self.log_activity(judge_name, "evaluation_saved", f"Team {team_id}: {team_name}")
@@ -249,16 +645,21 @@ class DatabaseManager:
                 
                 # Load scores
                 cursor.execute('''
-                    SELECT criterion_id, score FROM evaluations
-                    WHERE judge_name = ? AND team_id = ?
+                    SELECT c.key, s.score
+                    FROM scores s
+                    JOIN judges j ON j.id = s.judge_id
+                    JOIN criteria c ON c.id = s.criterion_id
+                    WHERE j.name = ? AND s.team_id = ?
                 ''', (judge_name, team_id))
                 
                 scores = {row[0]: row[1] for row in cursor.fetchall()}
                 
                 # Load comment
                 cursor.execute('''
-                    SELECT comment FROM comments
-                    WHERE judge_name = ? AND team_id = ?
+                    SELECT tc.comment
+                    FROM team_comments tc
+                    JOIN judges j ON j.id = tc.judge_id
+                    WHERE j.name = ? AND tc.team_id = ?
                 ''', (judge_name, team_id))
                 
                 comment_row = cursor.fetchone()
@@ -281,10 +682,11 @@ class DatabaseManager:
                 
                 # Count completed teams (teams with all criteria scored)
                 cursor.execute('''
-                    SELECT team_id, COUNT(DISTINCT criterion_id) as criteria_count
-                    FROM evaluations 
-                    WHERE judge_name = ?
-                    GROUP BY team_id
+                    SELECT s.team_id, COUNT(*) as criteria_count
+                    FROM judges j
+                    JOIN scores s ON s.judge_id = j.id
+                    WHERE j.name = ?
+                    GROUP BY s.team_id
                     HAVING criteria_count = ?
                 ''', (judge_name, len(CRITERIA)))
                 
@@ -300,22 +702,75 @@ class DatabaseManager:
             st.error(f"Failed to get progress: {e}")
             return {'completed_teams': 0, 'total_teams': len(TEAMS), 'progress': 0}
     
+    def refresh_analytics_snapshot(self) -> bool:
+        """Copy the live database into the read-only analytics snapshot.
+        
+        VACUUM INTO copies in a single read transaction, so concurrent
+        writes cannot force it to restart. It writes to a temporary file that
+        is renamed over the snapshot. Readers that already have the old
+        snapshot open keep a consistent view.
+        """
+        temp_file = f"{ANALYTICS_SNAPSHOT_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            with closing(sqlite3.connect(self.db_file)) as source:
+                source.execute("VACUUM INTO ?", (temp_file,))
+            os.replace(temp_file, ANALYTICS_SNAPSHOT_FILE)
+            return True
+        
+        except Exception as e:
+            print(f"Analytics snapshot refresh failed: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return False
+    
+    def get_analytics_snapshot_age(self) -> Optional[float]:
+        """Age of the analytics snapshot in seconds, or None if there is none"""
+        if not os.path.exists(ANALYTICS_SNAPSHOT_FILE):
+            return None
+        return max(0.0, time.time() - os.path.getmtime(ANALYTICS_SNAPSHOT_FILE))
+    
+    def start_analytics_thread(self):
+        """Start background thread that refreshes the analytics snapshot (one per process)"""
+        if not any(thread.name == "analytics-refresh" for thread in threading.enumerate()):
+            
+            def refresh_loop():
+                while True:
+                    self.ready.wait()
+                    self.refresh_analytics_snapshot()
+                    time.sleep(ANALYTICS_REFRESH_INTERVAL)
+            
+            refresh_thread = threading.Thread(target=refresh_loop, name="analytics-refresh", daemon=True)
+            refresh_thread.start()
+    
+    def connect_analytics(self) -> sqlite3.Connection:
+        """Open the analytics snapshot read-only (created on first use if the timer has not run yet)"""
+        if self.get_analytics_snapshot_age() is None:
+            self.refresh_analytics_snapshot()
+        
+        # The snapshot is never written in place, so SQLite can skip locking
+        return sqlite3.connect(f"file:{ANALYTICS_SNAPSHOT_FILE}?mode=ro&immutable=1", uri=True)
+    
     def export_all_data(self) -> Optional[pd.DataFrame]:
-        """Export all evaluation data as DataFrame"""
+        """Export all evaluation data as DataFrame (from the analytics snapshot)"""
         try:
-            with sqlite3.connect(self.db_file) as conn:
+            with closing(self.connect_analytics()) as conn:
                 query = '''
-                SELECT 
-                    e.judge_name,
-                    e.team_id,
-                    e.team_name,
-                    e.criterion_id,
-                    e.score,
-                    c.comment,
-                    e.updated_at
-                FROM evaluations e
-                LEFT JOIN comments c ON e.judge_name = c.judge_name AND e.team_id = c.team_id
-                ORDER BY e.judge_name, e.team_id, e.criterion_id
+                SELECT
+                    j.name AS judge_name,
+                    s.team_id,
+                    t.name AS team_name,
+                    c.key AS criterion_id,
+                    s.score,
+                    tc.comment,
+                    s.updated_at
+                FROM scores s
+                JOIN judges j ON j.id = s.judge_id
+                JOIN teams t ON t.id = s.team_id
+                JOIN criteria c ON c.id = s.criterion_id
+                LEFT JOIN team_comments tc ON tc.judge_id = s.judge_id AND tc.team_id = s.team_id
+                ORDER BY j.name, s.team_id, c.key
                 '''
                 
                 df = pd.read_sql_query(query, conn)
@@ -325,15 +780,47 @@ class DatabaseManager:
             st.error(f"Failed to export data: {e}")
             return None
     
+    def get_team_leaderboard(self) -> Optional[pd.DataFrame]:
+        """Rank teams by their average weighted score across judges (from the analytics snapshot)"""
+        try:
+            with closing(self.connect_analytics()) as conn:
+                query = '''
+                SELECT
+                    t.id AS team_id,
+                    t.name AS team_name,
+                    c.key AS criterion_id,
+                    AVG(s.score) AS avg_score,
+                    COUNT(*) AS judge_count
+                FROM scores s
+                JOIN teams t ON t.id = s.team_id
+                JOIN criteria c ON c.id = s.criterion_id
+                GROUP BY s.team_id, s.criterion_id
+                '''
+                
+                df = pd.read_sql_query(query, conn)
+                weights = {criterion['id']: criterion['weight'] / 100 for criterion in CRITERIA}
+                df['weighted'] = df['avg_score'] * df['criterion_id'].map(weights).fillna(0)
+                
+                leaderboard = df.groupby(['team_id', 'team_name'], as_index=False).agg(
+                    weighted_score=('weighted', 'sum'),
+                    judges=('judge_count', 'max')
+                )
+                return leaderboard.sort_values('weighted_score', ascending=False).reset_index(drop=True)
+        
+        except Exception as e:
+            st.error(f"Failed to build leaderboard: {e}")
+            return None
+    
     def create_database_backup(self) -> str:
-        """Create a backup of the entire database"""
+        """Create a compacted, consistent copy of the entire database"""
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = f"backup_database_{timestamp}.db"
+            backup_file = f"backup_database_{timestamp}_{threading.get_ident()}.db"
             
-            # Copy database file
-            import shutil
-            shutil.copy2(self.db_file, backup_file)
+            # VACUUM INTO reads inside a transaction (never a half-written
+            # file) and writes the copy without free pages
+            with closing(sqlite3.connect(self.db_file)) as conn:
+                conn.execute("VACUUM INTO ?", (backup_file,))
             
             return backup_file
             
@@ -341,87 +828,365 @@ class DatabaseManager:
             st.error(f"Failed to create database backup: {e}")
             return ""
     
+    def cleanup_local_backups(self, max_age: int = 600):
+        """Remove temporary backup files left behind by interrupted backups"""
+        for path in glob.glob("backup_database_*.db"):
+            try:
+                if time.time() - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def load_backup_manifest(self) -> List[Dict[str, Any]]:
+        """Load the local index of remote snapshots, oldest first"""
+        try:
+            with open(BACKUP_MANIFEST_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    
+    def save_backup_manifest(self, manifest: List[Dict[str, Any]]):
+        """Atomically write the local snapshot index"""
+        manifest = sorted(manifest, key=lambda entry: entry['created_at'])
+        temp_file = f"{BACKUP_MANIFEST_FILE}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temp_file, BACKUP_MANIFEST_FILE)
+    
+    def rebuild_backup_manifest(self, store) -> List[Dict[str, Any]]:
+        """Sync the manifest with the snapshots actually in the store (e.g. after it was lost)"""
+        listed = store.list_backups()
+        listed_names = {item['name'] for item in listed}
+        manifest = [entry for entry in self.load_backup_manifest() if entry['name'] in listed_names]
+        known = {entry['name'] for entry in manifest}
+        
+        for item in listed:
+            if item['name'] not in known:
+                manifest.append({
+                    'name': item['name'],
+                    'created_at': parse_backup_timestamp(item['name']).isoformat(),
+                    'size': item['size'],
+                    'sha256': parse_backup_digest(item['name']),
+                    'ref': item['ref']
+                })
+        
+        self.save_backup_manifest(manifest)
+        return self.load_backup_manifest()
+    
+    def prune_backups(self, store, manifest: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Delete snapshots that fall outside BACKUP_RETENTION; returns the remaining manifest
+        
+        At most BACKUP_PRUNE_BATCH snapshots are deleted per call; the rest stay
+        in the manifest and are pruned on later runs.
+        """
+        keep = select_backups_to_keep(manifest, datetime.now())
+        remaining = []
+        deleted = 0
+        
+        for entry in manifest:
+            if entry['name'] in keep or deleted >= BACKUP_PRUNE_BATCH:
+                remaining.append(entry)
+                continue
+            deleted += 1
+            try:
+                store.delete(entry['name'], entry.get('ref'))
+            except Exception as e:
+                print(f"Backup prune error: {e}")
+                remaining.append(entry)  # retry on the next run
+        
+        return remaining
+    
     def start_backup_thread(self):
-        """Start background thread for periodic backups"""
-        if not hasattr(st.session_state, 'backup_thread_started'):
-            st.session_state.backup_thread_started = True
+        """Start background thread for periodic backups (one per process)"""
+        if not any(thread.name == "database-backup" for thread in threading.enumerate()):
             
             def backup_loop():
                 while True:
                     time.sleep(BACKUP_INTERVAL)
                     try:
-                        self.backup_to_github()
+                        self.backup_to_store()
                     except Exception:
                         pass  # Silent fail for background backups
             
-            backup_thread = threading.Thread(target=backup_loop, daemon=True)
+            backup_thread = threading.Thread(target=backup_loop, name="database-backup", daemon=True)
             backup_thread.start()
     
-    def backup_to_github(self) -> bool:
-        """Backup database to your GitHub repository"""
-        if not GITHUB_TOKEN or not GITHUB_REPO:
+    def backup_to_store(self) -> bool:
+        """Upload a compressed snapshot to the backup store and prune old ones"""
+        store = get_backup_store()
+        if store is None or not self.store_synced.is_set() or self.backups_paused:
             return False
-            
+        
+        self.cleanup_local_backups()
+        backup_file = self.create_database_backup()
+        if not backup_file:
+            return False
+        
         try:
-            # Create database backup
-            backup_file = self.create_database_backup()
-            if not backup_file:
-                return False
-            
-            # Read backup file
             with open(backup_file, 'rb') as f:
-                content = base64.b64encode(f.read()).decode()
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
             
-            # Upload to your GitHub repository
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = f"{BACKUP_FOLDER}/database_backup_{timestamp}.db"
+            if not os.path.exists(BACKUP_MANIFEST_FILE):
+                manifest = self.rebuild_backup_manifest(store)
+            else:
+                manifest = self.load_backup_manifest()
             
-            # Check if backup folder exists, create if not
-            folder_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{BACKUP_FOLDER}"
-            headers = {
-                "Authorization": f"token {GITHUB_TOKEN}",
-                "Accept": "application/vnd.github.v3+json"
-            }
+            # Nothing changed since the last snapshot
+            if manifest and manifest[-1]['sha256'] == digest:
+                return True
             
-            # Try to create backup folder
+            # The digest goes in the name so a rebuilt manifest can still verify it
+            now = datetime.now()
+            name = f"{BACKUP_NAME_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond // 1000:03d}_{digest}.db.gz"
+            ref = store.upload(name, gzip.compress(raw))
+            
+            manifest.append({
+                'name': name,
+                'created_at': now.isoformat(),
+                'size': len(raw),
+                'sha256': digest,
+                'ref': ref
+            })
+            self.save_backup_manifest(self.prune_backups(store, manifest))
+            return True
+            
+        except Exception as e:
+            print(f"Backup error: {e}")
+            return False
+            
+        finally:
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
+    
+    def fetch_snapshot(self, store, entry: Dict[str, Any], dest_file: str):
+        """Stream a snapshot from the store into dest_file and verify it
+        
+        A snapshot that fails verification raises ValueError; store and
+        network errors propagate unchanged so callers can retry them.
+        """
+        digest = hashlib.sha256()
+        with store.open_download(entry['name']) as source:
+            if entry['name'].endswith('.gz'):
+                source = gzip.GzipFile(fileobj=source)
+            with open(dest_file, 'wb') as f:
+                while True:
+                    try:
+                        chunk = source.read(1024 * 1024)
+                    except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+                        raise ValueError(f"Snapshot {entry['name']} is not valid gzip: {e}")
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+        
+        if entry.get('sha256') and digest.hexdigest() != entry['sha256']:
+            raise ValueError(f"Checksum mismatch for {entry['name']}")
+        
+        try:
+            with closing(sqlite3.connect(dest_file)) as conn:
+                if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                    raise ValueError(f"Snapshot {entry['name']} is corrupt")
+                # Older snapshots may predate the current schema
+                self.migrate_database(conn)
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Snapshot {entry['name']} is corrupt: {e}")
+    
+    def install_snapshot(self, snapshot_file: str):
+        """Replace the live database with a verified snapshot file"""
+        # The backup API swaps pages under SQLite's own locking, so open
+        # connections see either the old or the new database
+        with closing(sqlite3.connect(snapshot_file)) as source, closing(sqlite3.connect(self.db_file)) as target:
+            source.backup(target)
+        
+        self.init_database()
+        self.refresh_analytics_snapshot()
+    
+    def has_evaluations(self, db_file: str) -> bool:
+        """Whether a database file holds any scores or comments"""
+        with closing(sqlite3.connect(db_file)) as conn:
+            return bool(conn.execute('''
+                SELECT EXISTS (SELECT 1 FROM scores) OR EXISTS (SELECT 1 FROM team_comments)
+            ''').fetchone()[0])
+    
+    def merge_newer_rows(self, other_file: str) -> int:
+        """Apply scores and comments from other_file that are newer than (or missing from) the live ones"""
+        with closing(sqlite3.connect(self.db_file)) as conn:
+            cursor = conn.cursor()
+            cursor.execute("ATTACH DATABASE ? AS other", (other_file,))
+            
+            cursor.execute("BEGIN TRANSACTION")
             try:
-                folder_data = {
-                    "message": f"Create backup folder",
-                    "content": base64.b64encode(b"# Database Backups\n\nThis folder contains automated database backups from the satellite judging system.").decode(),
-                    "path": f"{BACKUP_FOLDER}/README.md"
-                }
-                requests.put(f"https://api.github.com/repos/{GITHUB_REPO}/contents/{BACKUP_FOLDER}/README.md", 
-                           json=folder_data, headers=headers)
-            except:
-                pass  # Folder might already exist
+                # Judge ids differ between files, so match judges by name
+                cursor.execute('''
+                    INSERT INTO judges (name, created_at, last_active)
+                    SELECT name, created_at, last_active FROM other.judges WHERE true
+                    ON CONFLICT(name) DO NOTHING
+                ''')
+                cursor.execute('''
+                    INSERT OR REPLACE INTO scores (judge_id, team_id, criterion_id, score, updated_at)
+                    SELECT j.id, src.team_id, c.id, src.score, src.updated_at
+                    FROM other.scores src
+                    JOIN other.judges oj ON oj.id = src.judge_id
+                    JOIN judges j ON j.name = oj.name
+                    JOIN other.criteria oc ON oc.id = src.criterion_id
+                    JOIN criteria c ON c.key = oc.key
+                    LEFT JOIN scores s ON s.judge_id = j.id AND s.team_id = src.team_id AND s.criterion_id = c.id
+                    WHERE s.updated_at IS NULL OR src.updated_at > s.updated_at
+                ''')
+                merged = cursor.rowcount
+                cursor.execute('''
+                    INSERT OR REPLACE INTO team_comments (judge_id, team_id, comment, updated_at)
+                    SELECT j.id, src.team_id, src.comment, src.updated_at
+                    FROM other.team_comments src
+                    JOIN other.judges oj ON oj.id = src.judge_id
+                    JOIN judges j ON j.name = oj.name
+                    LEFT JOIN team_comments tc ON tc.judge_id = j.id AND tc.team_id = src.team_id
+                    WHERE tc.updated_at IS NULL OR src.updated_at > tc.updated_at
+                ''')
+                merged += cursor.rowcount
+                cursor.execute("COMMIT")
+            except Exception as e:
+                cursor.execute("ROLLBACK")
+                raise e
             
-            # Upload database backup
-            url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{file_path}"
+            cursor.execute("DETACH DATABASE other")
+            return merged
+    
+    def restore_backup(self, target_time: datetime, report_error=st.error) -> Optional[Dict[str, Any]]:
+        """Restore the snapshot closest to target_time over the live database
+        
+        report_error shows failures (st.error in the app, print on the command line).
+        """
+        store = get_backup_store()
+        if store is None:
+            report_error("Backup store not configured")
+            return None
+        
+        self.wait_until_ready()
+        temp_file = f"restore_{threading.get_ident()}.db"
+        try:
+            manifest = self.load_backup_manifest() or self.rebuild_backup_manifest(store)
+            if not manifest:
+                report_error("No backups found")
+                return None
             
-            data = {
-                "message": f"Auto-backup: Database backup {timestamp}",
-                "content": content,
-                "branch": "main"
-            }
+            entry = min(manifest, key=lambda e: abs((datetime.fromisoformat(e['created_at']) - target_time).total_seconds()))
             
-            response = requests.put(url, json=data, headers=headers)
+            self.fetch_snapshot(store, entry, temp_file)
+            self.install_snapshot(temp_file)
+            self.log_activity("admin", "backup_restored", entry['name'])
+            return entry
             
-            # Clean up local backup file
-            os.remove(backup_file)
+        except Exception as e:
+            report_error(f"Failed to restore backup: {e}")
+            return None
             
-            if response.status_code == 201:
-                return True
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    
+    def warm_start(self, db_was_missing: bool):
+        """Bring a missing or stale local database up to date from the backup store.
+        
+        Runs once per process in the background. Saves and the judging page wait
+        on self.ready, backups on self.store_synced. Store and network errors are
+        retried with backoff. If the local database already holds evaluations,
+        saves are released to it after WARM_START_TIMEOUT and the snapshot is
+        merged in once the store answers; an empty one stays blocked, since
+        scores entered against it would be newer than the real ones. Any other
+        failure pauses backups.
+        """
+        store = get_backup_store()
+        start = time.perf_counter()
+        delay = WARM_START_RETRY_DELAY
+        
+        while True:
+            try:
+                self.sync_from_store(store, db_was_missing, start)
+            except (requests.RequestException, OSError, RuntimeError) as e:
+                self.warm_start_status = {
+                    'state': 'retrying',
+                    'message': f"Backup store unavailable, retrying in {delay}s (backups off until then): {e}"
+                }
+                print(self.warm_start_status['message'])
+                
+                remaining = WARM_START_TIMEOUT - (time.perf_counter() - start)
+                if not self.ready.is_set() and remaining <= 0 and not db_was_missing and self.has_evaluations(self.db_file):
+                    self.ready.set()
+                # Wake up at the deadline rather than a full backoff step past it
+                time.sleep(min(delay, remaining) if remaining > 0 else delay)
+                delay = min(delay * 2, WARM_START_MAX_RETRY_DELAY)
+                continue
+            except Exception as e:
+                # A local failure (e.g. SQLite) would fail the same way on every retry
+                self.backups_paused = True
+                self.warm_start_status = {'state': 'failed', 'message': f"Warm start failed, backups paused: {e}"}
+                print(self.warm_start_status['message'])
+            break
+        
+        self.ready.set()
+        self.store_synced.set()
+    
+    def sync_from_store(self, store, db_was_missing: bool, start: float):
+        """One warm start attempt; raises if the store cannot be listed or read"""
+        snapshot_file = f"warm_start_snapshot_{os.getpid()}.db"
+        
+        try:
+            # Newest snapshot that downloads and verifies cleanly
+            manifest = self.rebuild_backup_manifest(store)
+            snapshot = None
+            for entry in reversed(manifest):
+                try:
+                    self.fetch_snapshot(store, entry, snapshot_file)
+                    snapshot = entry
+                    break
+                except ValueError as e:
+                    print(f"Warm start: skipping snapshot {entry['name']}: {e}")
+            
+            if snapshot is None and manifest:
+                # Uploading this (possibly empty) database would push the snapshots
+                # out of retention before anyone can look at them
+                self.backups_paused = True
+                self.warm_start_status = {'state': 'failed', 'message': "Warm start failed, backups paused: no backup snapshot passed verification"}
+                print(self.warm_start_status['message'])
+                return
+            if snapshot is None:
+                self.warm_start_status = {'state': 'skipped', 'message': "No backup snapshots yet"}
+                return
+            
+            if (db_was_missing and not self.ready.is_set()) or not self.has_evaluations(self.db_file):
+                self.install_snapshot(snapshot_file)
+                message = f"Restored {snapshot['name']} in {time.perf_counter() - start:.2f}s"
             else:
-                # Log error for debugging
-                print(f"GitHub backup failed: {response.status_code} - {response.text}")
-                return False
+                # Stale database (or saves made while the store was down):
+                # apply only the rows the snapshot has newer
+                merged = self.merge_newer_rows(snapshot_file)
+                if not merged:
+                    self.warm_start_status = {'state': 'current', 'message': "Local database is up to date"}
+                    return
+                self.refresh_analytics_snapshot()
+                message = f"Applied {merged} newer rows from {snapshot['name']} in {time.perf_counter() - start:.2f}s"
             
-        except Exception as e:
-            print(f"GitHub backup error: {e}")
-            return False
+            self.warm_start_status = {'state': 'restored', 'message': message}
+            self.log_activity("system", "warm_start_restore", message)
+            print(message)
+            
+        finally:
+            if os.path.exists(snapshot_file):
+                os.remove(snapshot_file)
+
+@st.cache_resource
+def get_database_manager() -> DatabaseManager:
+    """One DatabaseManager per server process, shared by all sessions and reruns"""
+    return DatabaseManager(DB_FILE)
 
-# Initialize database manager
-db_manager = DatabaseManager(DB_FILE)
+def is_restore_command() -> bool:
+    """Whether the script was started as `python streamlit_judging_app.py restore <time>`"""
+    return __name__ == "__main__" and len(sys.argv) == 3 and sys.argv[1] == "restore"
+
+# Initialize database manager (the restore command builds its own, without background threads)
+db_manager = None if is_restore_command() else get_database_manager()
 
 def normalize_judge_name(name: str) -> str:
     """Normalize judge name: Title Case"""
@@ -445,6 +1210,44 @@ def calculate_weighted_score(scores: Dict[str, int]) -> float:
             total_score += scores[criterion['id']] * criterion['weight'] / 100
     return total_score
 
+def get_score_chart_key(scores: Dict[str, Any]) -> Tuple[Tuple[str, int], ...]:
+    """Hashable (criterion, score) pairs in CRITERIA order; the cache key for summary charts"""
+    return tuple((criterion['id'], scores[criterion['id']]) for criterion in CRITERIA if criterion['id'] in scores)
+
+def get_score_chart_rows(scores_key: Tuple[Tuple[str, int], ...]) -> List[Dict[str, Any]]:
+    """Rows for the score breakdown chart"""
+    names = {criterion['id']: criterion for criterion in CRITERIA}
+    score_data = []
+    for criterion_id, score in scores_key:
+        criterion = names[criterion_id]
+        score_data.append({
+            'Criterion': criterion['name'][:20] + '...' if len(criterion['name']) > 20 else criterion['name'],
+            'Score': score,
+            'Weight': criterion['weight']
+        })
+    return score_data
+
+@st.cache_resource(max_entries=256)
+def build_score_chart(scores_key: Tuple[Tuple[str, int], ...]):
+    """Plotly score breakdown, rebuilt only when a team's scores change"""
+    import plotly.express as px
+    fig = px.bar(
+        get_score_chart_rows(scores_key),
+        x='Score',
+        y='Criterion',
+        orientation='h',
+        title='Score Breakdown',
+        color='Score',
+        color_continuous_scale='RdYlGn'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_data(max_entries=256)
+def build_score_frame(scores_key: Tuple[Tuple[str, int], ...]) -> pd.DataFrame:
+    """Score breakdown as a DataFrame for the lightweight native chart"""
+    return pd.DataFrame(get_score_chart_rows(scores_key)).set_index('Criterion')[['Score']]
+
 def main():
     st.title("🛰️ Satellite Imagery Challenge - Judging System")
     st.markdown("---")
@@ -479,6 +1282,15 @@ def main():
         if judge_name != raw_judge_name:
             st.info(f"Name normalized to: {judge_name}")
         
+        # Nothing below is accurate until the backup is restored: progress would
+        # read 0 and the form would default every score to 1
+        if not db_manager.ready.is_set():
+            st.warning("⏳ Restoring database from backup - judging resumes when done")
+            if db_manager.warm_start_status and db_manager.warm_start_status['state'] == 'retrying':
+                st.caption(db_manager.warm_start_status['message'])
+            st.button("🔄 Check again")
+            st.stop()
+        
         # Register/update judge in database
         if db_manager.save_judge(judge_name):
             st.success(f"✅ Welcome, {judge_name}!")
@@ -524,16 +1336,45 @@ def main():
         # Manual save button
         if st.button("💾 Force Save", help="Force save current progress"):
             st.success("✅ Auto-save is always active!")
+        
+        st.checkbox("📉 Lightweight charts", key="lightweight_charts", help="Native charts that send far less data - for slow connections")
             
         # System status
         st.header("📊 System Status")
         st.success("🟢 Database Connected")
+        if db_manager.warm_start_status and db_manager.warm_start_status['state'] == 'restored':
+            st.info(f"♻️ {db_manager.warm_start_status['message']}")
+        elif db_manager.warm_start_status and db_manager.warm_start_status['state'] == 'retrying':
+            st.warning(f"⏳ {db_manager.warm_start_status['message']}")
+        elif db_manager.warm_start_status and db_manager.warm_start_status['state'] == 'failed':
+            st.error(f"⚠️ {db_manager.warm_start_status['message']}")
         st.info(f"🔄 Auto-backup every {BACKUP_INTERVAL}s")
         
         # Export options for admin
-        if st.button("📊 Admin Panel"):
+        if st.toggle("📊 Admin Panel", key="admin_panel"):
             st.header("📤 Data Export")
             
+            # Analytics snapshot freshness (exports and leaderboard read from it)
+            snapshot_age = db_manager.get_analytics_snapshot_age()
+            if snapshot_age is None:
+                st.caption(f"📸 Analytics snapshot not created yet (refreshes every {ANALYTICS_REFRESH_INTERVAL}s)")
+            else:
+                st.caption(f"📸 Analytics data is {snapshot_age:.0f}s old (refreshes every {ANALYTICS_REFRESH_INTERVAL}s)")
+            
+            if st.button("🔄 Refresh Analytics Snapshot"):
+                if db_manager.refresh_analytics_snapshot():
+                    st.success("✅ Analytics snapshot refreshed")
+                else:
+                    st.error("❌ Snapshot refresh failed")
+            
+            # Leaderboard
+            if st.button("Show Leaderboard"):
+                leaderboard = db_manager.get_team_leaderboard()
+                if leaderboard is not None:
+                    st.dataframe(leaderboard, hide_index=True)
+                else:
+                    st.error("❌ Leaderboard failed")
+            
             # Export to CSV
             if st.button("Export Results (CSV)"):
                 df = db_manager.export_all_data()
@@ -565,20 +1406,27 @@ def main():
                 else:
                     st.error("❌ Backup failed")
             
-            # GitHub backup status
-            if GITHUB_TOKEN and GITHUB_REPO:
-                st.success("✅ GitHub backup configured")
-                st.info(f"📂 Backup location: {GITHUB_REPO}/{BACKUP_FOLDER}")
+            # Backup store status
+            backup_store = get_backup_store()
+            if backup_store is not None:
+                st.success("✅ Backup store configured")
+                st.info(f"📂 Backup location: {backup_store.describe()}")
                 
                 # Show last backup attempt status
-                if st.button("🔄 Test GitHub Backup"):
-                    if db_manager.backup_to_github():
-                        st.success("✅ GitHub backup successful!")
+                if st.button("🔄 Test Backup"):
+                    if db_manager.backup_to_store():
+                        st.success("✅ Backup successful!")
                     else:
-                        st.error("❌ GitHub backup failed - check token and permissions")
+                        st.error("❌ Backup failed - check token and permissions")
+                
+                # Point-in-time restore is a server-side command, not a button
+                manifest = db_manager.load_backup_manifest()
+                if manifest:
+                    st.caption(f"🗂️ {len(manifest)} snapshots retained, newest {manifest[-1]['created_at']}")
+                st.caption('⏪ To restore, run `python streamlit_judging_app.py restore "YYYY-MM-DD HH:MM:SS"` on the server')
             else:
-                st.warning("⚠️ GitHub backup not configured")
-                st.info("Add GITHUB_TOKEN to Streamlit secrets to enable auto-backup")
+                st.warning("⚠️ Backup not configured")
+                st.info("Add GITHUB_TOKEN (or BACKUP_STORE_DIR) to Streamlit secrets to enable auto-backup")
     
     # Main content area
     selected_team = next(team for team in TEAMS if team['id'] == selected_team_id)
@@ -707,29 +1555,13 @@ def main():
             total_weighted = calculate_weighted_score(team_scores)
             st.metric("**Total Weighted Score**", f"{total_weighted:.2f}/5.0")
             
-            # Score visualization
-            score_data = []
-            for criterion in CRITERIA:
-                if criterion['id'] in team_scores:
-                    score_data.append({
-                        'Criterion': criterion['name'][:20] + '...' if len(criterion['name']) > 20 else criterion['name'],
-                        'Score': team_scores[criterion['id']],
-                        'Weight': criterion['weight']
-                    })
-            
-            if score_data:
-                import plotly.express as px
-                fig = px.bar(
-                    score_data, 
-                    x='Score', 
-                    y='Criterion',
-                    orientation='h',
-                    title='Score Breakdown',
-                    color='Score',
-                    color_continuous_scale='RdYlGn'
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+            # Score visualization (cached on the scores themselves)
+            scores_key = get_score_chart_key(team_scores)
+            if scores_key:
+                if st.session_state.get("lightweight_charts"):
+                    st.bar_chart(build_score_frame(scores_key), height=400)
+                else:
+                    st.plotly_chart(build_score_chart(scores_key), use_container_width=True)
 
     # Final completion status
     if completed_teams == len(TEAMS):
@@ -761,5 +1593,17 @@ def main():
             st.metric("Completion Rate", "100%")
 
 if __name__ == "__main__":
-    main()
+    # Command line restore: python streamlit_judging_app.py restore "YYYY-MM-DD HH:MM:SS"
+    if is_restore_command():
+        # No warm start: it would merge the newest snapshot in just before the restore overwrites it
+        restore_manager = DatabaseManager(DB_FILE, start_background=False)
+        start = time.perf_counter()
+        entry = restore_manager.restore_backup(datetime.fromisoformat(sys.argv[2]), report_error=print)
+        if entry:
+            print(f"Restored {entry['name']} in {time.perf_counter() - start:.2f}s")
+        else:
+            print("Restore failed")
+            sys.exit(1)
+    else:
+        main()
 
@@ -0,0 +1,26 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """Import the app in a scratch directory with no backup store configured"""
+    previous_dir = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("import"))
+    for key in ("GITHUB_TOKEN", "BACKUP_STORE_DIR", "BACKUP_STORE_URL"):
+        os.environ.pop(key, None)
+    try:
+        yield importlib.import_module("streamlit_judging_app")
+    finally:
+        os.chdir(previous_dir)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
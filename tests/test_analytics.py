@@ -0,0 +1,29 @@
+import sqlite3
+from contextlib import closing
+
+
+def scores(app, value):
+    return {criterion['id']: value for criterion in app.CRITERIA}
+
+
+def test_database_uses_wal(app, workdir):
+    app.DatabaseManager(app.DB_FILE)
+
+    with closing(sqlite3.connect(app.DB_FILE)) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_exports_read_the_snapshot_not_the_live_database(app, workdir):
+    manager = app.DatabaseManager(app.DB_FILE)
+    assert manager.save_evaluation("Jane Doe", 1, "Team 1", scores(app, 4))
+    assert manager.refresh_analytics_snapshot()
+
+    # Saved after the snapshot: invisible to exports until the next refresh
+    assert manager.save_evaluation("Jane Doe", 2, "Team 2", scores(app, 2))
+
+    assert manager.export_all_data()['team_id'].unique().tolist() == [1]
+    assert manager.get_team_leaderboard()['team_id'].tolist() == [1]
+
+    assert manager.refresh_analytics_snapshot()
+    assert sorted(manager.export_all_data()['team_id'].unique().tolist()) == [1, 2]
+    assert manager.get_team_leaderboard()['team_id'].tolist() == [1, 2]
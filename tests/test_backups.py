@@ -0,0 +1,289 @@
+import gzip
+import os
+import subprocess
+import sys
+import threading
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+SCORES_LOW = {"problem_definition": 3, "technical_execution": 3, "results_interpretation": 3, "learning_reflection": 3,
+              "presentation_quality": 3, "long_term_vision": 3, "scientific_evaluation": 3, "team_expertise": 3}
+SCORES_HIGH = {key: 5 for key in SCORES_LOW}
+
+
+def make_manager(app, monkeypatch, store_dir=None):
+    """A DatabaseManager for the current directory, warm-started from store_dir if given"""
+    monkeypatch.setattr(app, "BACKUP_STORE_DIR", str(store_dir) if store_dir else "")
+    manager = app.DatabaseManager(app.DB_FILE)
+    assert manager.store_synced.wait(30)
+    return manager
+
+
+def set_updated_at(db_file, team_id, updated_at):
+    with closing(sqlite3.connect(db_file)) as conn:
+        conn.execute("UPDATE scores SET updated_at = ? WHERE team_id = ?", (updated_at, team_id))
+        conn.execute("UPDATE team_comments SET updated_at = ? WHERE team_id = ?", (updated_at, team_id))
+        conn.commit()
+
+
+def test_select_backups_to_keep_applies_retention_tiers(app):
+    now = datetime.fromtimestamp(86400 * 20000)  # aligned to every tier's spacing
+
+    def entry(age):
+        created_at = now - timedelta(seconds=age)
+        return {"name": f"backup_{age}", "created_at": created_at.isoformat()}
+
+    ages = [
+        5, 10,                                  # same 30s slot: newest wins
+        45,                                     # next 30s slot
+        7260, 7320,                             # same hour, two hours ago
+        3 * 86400 + 100, 3 * 86400 + 200,       # same day, three days ago
+        4 * 86400 + 100,                        # four days ago
+    ]
+    keep = app.select_backups_to_keep([entry(age) for age in ages], now)
+
+    assert keep == {f"backup_{age}" for age in (5, 45, 7260, 3 * 86400 + 100, 4 * 86400 + 100)}
+
+
+def test_local_store_backup_prune_and_restore(app, workdir, monkeypatch):
+    manager = make_manager(app, monkeypatch)
+    store_dir = workdir / "store"
+    monkeypatch.setattr(app, "BACKUP_STORE_DIR", str(store_dir))
+    store = app.LocalBackupStore(str(store_dir))
+
+    assert manager.save_evaluation("Jane Doe", 1, "Team 1", SCORES_LOW, "first pass")
+    assert manager.backup_to_store()
+    assert manager.backup_to_store()  # unchanged database: no second upload
+    first = store.list_backups()
+    assert len(first) == 1
+    assert app.parse_backup_digest(first[0]["name"]) == manager.load_backup_manifest()[0]["sha256"]
+
+    # Date the first snapshot one backup interval back so it has its own 30s slot
+    manifest = manager.load_backup_manifest()
+    manifest[0]["created_at"] = (datetime.now() - timedelta(seconds=app.BACKUP_INTERVAL + 5)).isoformat()
+
+    # Three stale snapshots in the same day, two days ago: only the newest survives
+    noon = datetime.fromtimestamp((datetime.now().timestamp() // 86400 - 2) * 86400 + 43200)
+    for minutes in (0, 10, 20):
+        created_at = noon + timedelta(minutes=minutes)
+        name = f"{app.BACKUP_NAME_PREFIX}{created_at.strftime('%Y%m%d_%H%M%S')}_000.db.gz"
+        store.upload(name, b"stale")
+        manifest.append({"name": name, "created_at": created_at.isoformat(), "size": 5, "sha256": None, "ref": None})
+    manager.save_backup_manifest(manifest)
+
+    assert manager.save_evaluation("Jane Doe", 1, "Team 1", SCORES_HIGH, "second pass")
+    assert manager.backup_to_store()
+
+    names = [item["name"] for item in store.list_backups()]
+    assert len(names) == 3
+    assert f"{app.BACKUP_NAME_PREFIX}{(noon + timedelta(minutes=20)).strftime('%Y%m%d_%H%M%S')}_000.db.gz" in names
+    assert [entry["name"] for entry in manager.load_backup_manifest()] == names
+
+    restored = manager.restore_backup(datetime.fromisoformat(manager.load_backup_manifest()[1]["created_at"]), report_error=pytest.fail)
+    assert restored["name"] == first[0]["name"]
+    evaluation = manager.load_evaluation("Jane Doe", 1)
+    assert evaluation["problem_definition"] == 3
+    assert evaluation["comment"] == "first pass"
+
+
+def seed_store(app, monkeypatch, directory, store_dir, comment="from backup", updated_at=None):
+    """Create a database in directory and back it up to store_dir"""
+    monkeypatch.chdir(directory)
+    manager = make_manager(app, monkeypatch)
+    assert manager.save_evaluation("Jane Doe", 1, "Team 1", SCORES_HIGH, comment)
+    if updated_at:
+        set_updated_at(app.DB_FILE, 1, updated_at)
+    monkeypatch.setattr(app, "BACKUP_STORE_DIR", str(store_dir))
+    assert manager.backup_to_store()
+    return manager
+
+
+def test_warm_start_restores_missing_database(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "new").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store")
+
+    monkeypatch.chdir(workdir / "new")
+    manager = make_manager(app, monkeypatch, workdir / "store")
+
+    assert manager.warm_start_status["state"] == "restored"
+    assert not manager.backups_paused
+    assert manager.load_evaluation("Jane Doe", 1)["comment"] == "from backup"
+
+
+def test_warm_start_merges_newer_rows_into_stale_database(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "stale").mkdir()
+
+    # Stale local copy: an older pass over team 1 plus a team only it has seen
+    monkeypatch.chdir(workdir / "stale")
+    stale = make_manager(app, monkeypatch)
+    assert stale.save_evaluation("Jane Doe", 1, "Team 1", SCORES_LOW, "stale")
+    assert stale.save_evaluation("Jane Doe", 2, "Team 2", SCORES_LOW, "local only")
+    set_updated_at(app.DB_FILE, 1, "2026-01-01 10:00:00")
+
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store", comment="newer", updated_at="2026-01-01 11:00:00")
+
+    monkeypatch.chdir(workdir / "stale")
+    manager = make_manager(app, monkeypatch, workdir / "store")
+
+    assert manager.warm_start_status["state"] == "restored"
+    assert manager.load_evaluation("Jane Doe", 1)["comment"] == "newer"
+    assert manager.load_evaluation("Jane Doe", 1)["problem_definition"] == 5
+    assert manager.load_evaluation("Jane Doe", 2)["comment"] == "local only"
+
+
+def test_warm_start_falls_back_past_corrupt_snapshot(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "new").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store")
+
+    newer = datetime.now() + timedelta(minutes=1)
+    corrupt_name = f"{app.BACKUP_NAME_PREFIX}{newer.strftime('%Y%m%d_%H%M%S')}_000.db.gz"
+    (workdir / "store" / corrupt_name).write_bytes(gzip.compress(b"not a database" * 100))
+
+    monkeypatch.chdir(workdir / "new")
+    manager = make_manager(app, monkeypatch, workdir / "store")
+
+    assert manager.warm_start_status["state"] == "restored"
+    assert corrupt_name not in manager.warm_start_status["message"]
+    assert not manager.backups_paused
+    assert manager.load_evaluation("Jane Doe", 1)["comment"] == "from backup"
+
+
+def test_warm_start_pauses_backups_only_when_every_snapshot_is_corrupt(app, workdir, monkeypatch):
+    store_dir = workdir / "store"
+    store_dir.mkdir()
+    (store_dir / f"{app.BACKUP_NAME_PREFIX}20260101_000000_000.db.gz").write_bytes(b"garbage")
+
+    manager = make_manager(app, monkeypatch, store_dir)
+
+    assert manager.warm_start_status["state"] == "failed"
+    assert manager.backups_paused
+    assert not manager.backup_to_store()
+
+
+def test_warm_start_retries_unreachable_store_without_pausing(app, workdir, monkeypatch):
+    local = make_manager(app, monkeypatch)
+    assert local.save_evaluation("Jane Doe", 1, "Team 1", SCORES_LOW, "local")
+
+    monkeypatch.setattr(app, "BACKUP_STORE_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(app, "WARM_START_RETRY_DELAY", 0.05)
+    monkeypatch.setattr(app, "WARM_START_TIMEOUT", 0.2)
+    manager = app.DatabaseManager(app.DB_FILE)
+
+    assert manager.ready.wait(30)  # a database with evaluations is released after WARM_START_TIMEOUT
+    assert manager.warm_start_status["state"] == "retrying"
+    assert not manager.store_synced.is_set()
+    assert not manager.backups_paused
+    assert manager.load_evaluation("Jane Doe", 1)["comment"] == "local"
+
+
+def test_warm_start_keeps_empty_database_blocked_while_store_unreachable(app, workdir, monkeypatch):
+    monkeypatch.setattr(app, "BACKUP_STORE_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(app, "WARM_START_RETRY_DELAY", 0.05)
+    monkeypatch.setattr(app, "WARM_START_TIMEOUT", 0.2)
+    manager = app.DatabaseManager(app.DB_FILE)
+
+    assert not manager.ready.wait(1)
+    assert manager.warm_start_status["state"] == "retrying"
+    assert not manager.save_evaluation("Jane Doe", 1, "Team 1", SCORES_LOW)
+
+
+def test_warm_start_pauses_backups_on_local_failure(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "stale").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store", updated_at="2026-01-01 11:00:00")
+    monkeypatch.chdir(workdir / "stale")
+    stale = make_manager(app, monkeypatch)
+    assert stale.save_evaluation("Jane Doe", 2, "Team 2", SCORES_LOW)
+
+    def failing_merge(self, other_file):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(app.DatabaseManager, "merge_newer_rows", failing_merge)
+    manager = make_manager(app, monkeypatch, workdir / "store")
+
+    assert manager.warm_start_status["state"] == "failed"
+    assert "disk is full" in manager.warm_start_status["message"]
+    assert manager.backups_paused
+    assert manager.ready.is_set()
+
+
+def test_save_during_restore_keeps_restored_scores(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "new").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store")
+
+    download_started = threading.Event()
+    release_download = threading.Event()
+
+    class SlowStore(app.LocalBackupStore):
+        def open_download(self, name):
+            download_started.set()
+            release_download.wait(30)
+            return super().open_download(name)
+
+    monkeypatch.setattr(app, "get_backup_store", lambda: SlowStore(str(workdir / "store")))
+    monkeypatch.chdir(workdir / "new")
+    manager = app.DatabaseManager(app.DB_FILE)
+    assert download_started.wait(30)
+
+    # A form rendered against the empty database would submit the default scores
+    defaults = {key: 1 for key in SCORES_LOW}
+    assert not manager.save_evaluation("Jane Doe", 1, "Team 1", defaults, "")
+
+    release_download.set()
+    assert manager.store_synced.wait(30)
+    evaluation = manager.load_evaluation("Jane Doe", 1)
+    assert evaluation["problem_definition"] == 5
+    assert evaluation["comment"] == "from backup"
+
+
+def test_manager_without_background_skips_warm_start(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "live").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store")
+
+    monkeypatch.chdir(workdir / "live")
+    manager = app.DatabaseManager(app.DB_FILE, start_background=False)
+
+    assert manager.ready.is_set() and manager.store_synced.is_set()
+    assert manager.warm_start_status is None
+    assert manager.load_evaluation("Jane Doe", 1) == {"comment": ""}
+
+
+def test_restore_command(app, workdir, monkeypatch):
+    (workdir / "old").mkdir()
+    (workdir / "live").mkdir()
+    seed_store(app, monkeypatch, workdir / "old", workdir / "store")
+    snapshot_name = app.LocalBackupStore(str(workdir / "store")).list_backups()[0]["name"]
+
+    monkeypatch.chdir(workdir / "live")
+    live = make_manager(app, monkeypatch)
+    assert live.save_evaluation("Jane Doe", 1, "Team 1", SCORES_LOW, "live")
+
+    snapshot_time = app.parse_backup_timestamp(snapshot_name)
+    env = dict(os.environ, BACKUP_STORE_DIR=str(workdir / "store"))
+    result = subprocess.run(
+        [sys.executable, app.__file__, "restore", snapshot_time.isoformat()],
+        cwd=workdir / "live", env=env, capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Restored" in result.stdout
+    assert live.load_evaluation("Jane Doe", 1)["comment"] == "from backup"
+
+
+def test_restore_command_reports_unreachable_store(app, workdir):
+    env = dict(os.environ, BACKUP_STORE_URL="http://127.0.0.1:9")
+    result = subprocess.run(
+        [sys.executable, app.__file__, "restore", "2026-01-01 00:00:00"],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 1
+    assert "Failed to restore backup" in result.stdout
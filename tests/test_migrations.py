@@ -0,0 +1,90 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+LEGACY_EXPORT_QUERY = '''
+    SELECT e.judge_name, e.team_id, e.criterion_id, e.score, c.comment, e.updated_at
+    FROM evaluations e
+    LEFT JOIN comments c ON e.judge_name = c.judge_name AND e.team_id = c.team_id
+    ORDER BY e.judge_name, e.team_id, e.criterion_id
+'''
+
+
+def build_legacy_database(app, db_file):
+    """A version-1 database as written by the original app"""
+    with closing(sqlite3.connect(db_file)) as conn:
+        cursor = conn.cursor()
+        app.migrate_v1_initial_schema(cursor)
+        cursor.execute("PRAGMA user_version = 1")
+        for judge_name, team_ids in (("Jane Doe", (1, 2)), ("John Smith", (1,))):
+            cursor.execute("INSERT INTO judges (name) VALUES (?)", (judge_name,))
+            for team_id in team_ids:
+                for index, criterion in enumerate(app.CRITERIA):
+                    cursor.execute('''
+                        INSERT INTO evaluations (judge_name, team_id, team_name, criterion_id, score, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (judge_name, team_id, f"Old name {team_id}", criterion['id'], index % 5 + 1, f"2026-01-0{team_id} 10:00:00"))
+                cursor.execute('''
+                    INSERT INTO comments (judge_name, team_id, comment, updated_at) VALUES (?, ?, ?, ?)
+                ''', (judge_name, team_id, f"{judge_name} on team {team_id}", f"2026-01-0{team_id} 10:00:00"))
+        # A partial evaluation: scored but not complete
+        cursor.execute('''
+            INSERT INTO evaluations (judge_name, team_id, team_name, criterion_id, score) VALUES (?, ?, ?, ?, ?)
+        ''', ("John Smith", 3, "Old name 3", app.CRITERIA[0]['id'], 4))
+        conn.commit()
+
+        return [tuple(row) for row in conn.execute(LEGACY_EXPORT_QUERY)]
+
+
+def test_v1_database_migrates_with_same_export(app, workdir):
+    legacy_rows = build_legacy_database(app, app.DB_FILE)
+
+    manager = app.DatabaseManager(app.DB_FILE)
+
+    with closing(sqlite3.connect(app.DB_FILE)) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(app.MIGRATIONS) == 2
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "evaluations" not in tables and "comments" not in tables
+
+    export = manager.export_all_data()
+    export = export.astype(object).where(export.notna(), None)  # NaN -> None for missing comments
+    assert [
+        (row.judge_name, row.team_id, row.criterion_id, row.score, row.comment, row.updated_at)
+        for row in export.itertuples()
+    ] == legacy_rows
+    # Team names now come from TEAMS rather than the copy stored on each row
+    team_names = {team['id']: team['name'] for team in app.TEAMS}
+    assert all(row.team_name == team_names[row.team_id] for row in export.itertuples())
+
+    assert manager.get_judge_progress("Jane Doe")['completed_teams'] == 2
+    assert manager.get_judge_progress("John Smith")['completed_teams'] == 1
+    evaluation = manager.load_evaluation("Jane Doe", 2)
+    assert evaluation['comment'] == "Jane Doe on team 2"
+    assert evaluation[app.CRITERIA[1]['id']] == 2
+
+
+def test_failed_migration_leaves_legacy_database_untouched(app, workdir, monkeypatch):
+    manager = app.DatabaseManager("scratch.db")
+    legacy_rows = build_legacy_database(app, app.DB_FILE)
+
+    def failing_migration(cursor):
+        app.migrate_v2_normalized_scores(cursor)
+        raise RuntimeError("interrupted")
+
+    migrations = app.MIGRATIONS
+    monkeypatch.setattr(app, "MIGRATIONS", [app.migrate_v1_initial_schema, failing_migration])
+    with closing(sqlite3.connect(app.DB_FILE)) as conn:
+        with pytest.raises(RuntimeError):
+            manager.migrate_database(conn)
+
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+        assert [tuple(row) for row in conn.execute(LEGACY_EXPORT_QUERY)] == legacy_rows
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'scores'").fetchone()[0] == 0
+
+    # The next start simply runs the migration again
+    monkeypatch.setattr(app, "MIGRATIONS", migrations)
+    with closing(sqlite3.connect(app.DB_FILE)) as conn:
+        manager.migrate_database(conn)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] == len(legacy_rows)